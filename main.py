@@ -1,10 +1,15 @@
 import os
+import re
+import functools
 import logging
 import sqlite3
 import threading
+import queue
+from collections import namedtuple
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List
 from contextlib import contextmanager
+from concurrent.futures import Future
 import phonenumbers
 from phonenumbers import NumberParseException
 from telegram import (
@@ -13,9 +18,9 @@ from telegram import (
 )
 from telegram.ext import (
     Application, CommandHandler, MessageHandler, ChatMemberHandler, 
-    ChatJoinRequestHandler, ContextTypes, filters, PicklePersistence
+    ChatJoinRequestHandler, ContextTypes, filters, PicklePersistence, PersistenceInput
 )
-from telegram.constants import ChatMemberStatus, ParseMode
+from telegram.constants import ChatMemberStatus, ChatType, ParseMode
 from telegram.error import Forbidden, BadRequest
 import asyncio
 
@@ -29,27 +34,142 @@ logger = logging.getLogger(__name__)
 # Configuration
 BOT_TOKEN = os.getenv('BOT_TOKEN')
 ADMIN_ID = int(os.getenv('ADMIN_ID', '0'))
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '6'))
+
+# Per-request SQL kept as constants so every call passes identical text and hits sqlite3's statement cache
+SQL_ADD_VERIFIED_USER = '''
+    INSERT INTO verified_users (user_id, username, first_name,
+    phone_number, verified_date, is_banned)
+    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, FALSE)
+    ON CONFLICT(user_id) DO UPDATE SET
+        username = excluded.username, first_name = excluded.first_name,
+        phone_number = excluded.phone_number, verified_date = excluded.verified_date,
+        is_banned = FALSE
+'''
+SQL_ADD_JOIN_REQUEST = "INSERT OR REPLACE INTO join_requests (user_id, chat_id, request_date, status) VALUES (?, ?, CURRENT_TIMESTAMP, 'pending')"
+SQL_PENDING_JOIN_REQUESTS = "SELECT chat_id FROM join_requests WHERE user_id = ? AND status = 'pending'"
+SQL_UPDATE_JOIN_REQUEST_STATUS = "UPDATE join_requests SET status = ? WHERE user_id = ? AND chat_id = ?"
+SQL_DELETE_JOIN_REQUEST = "DELETE FROM join_requests WHERE user_id = ? AND chat_id = ?"
+SQL_BAN_USER = 'UPDATE verified_users SET is_banned = TRUE WHERE user_id = ?'
+SQL_GET_USER_INFO = '''
+    SELECT user_id, username, first_name, phone_number, verified_date, is_banned
+    FROM verified_users WHERE user_id = ?
+'''
+SQL_ALL_GROUPS = 'SELECT id, name, description, link, chat_id FROM managed_groups ORDER BY id'
+SQL_GET_GROUP = 'SELECT id, name, description, link, chat_id FROM managed_groups WHERE id = ?'
+SQL_ADD_GROUP = 'INSERT INTO managed_groups (name, description, link) VALUES (?, ?, ?)'
+SQL_DELETE_GROUP = 'DELETE FROM managed_groups WHERE id = ?'
+SQL_UPDATE_GROUP_CHAT_ID = 'UPDATE managed_groups SET chat_id = ? WHERE link = ?'
+# All /stats counts in one statement; each subquery is answered from a covering index
+SQL_STATS = '''
+    SELECT (SELECT COUNT(*) FROM verified_users WHERE is_banned = FALSE),
+           (SELECT COUNT(*) FROM verified_users WHERE is_banned = TRUE),
+           (SELECT COUNT(*) FROM managed_groups),
+           (SELECT COUNT(*) FROM join_requests WHERE status = 'pending')
+'''
+
+# Lightweight row types; Group lives in the groups cache for the bot's lifetime
+Group = namedtuple('Group', 'id name description link chat_id')
+VerifiedUser = namedtuple('VerifiedUser', 'user_id username first_name phone_number verified_date is_banned')
 
 
 class DatabaseManager:
     """Manages all interactions with the SQLite database using best practices."""
     
-    def __init__(self, db_path: str = "filipino_bot.db"):
+    def __init__(self, db_path: str = "filipino_bot.db", pool_size: int = DB_POOL_SIZE):
         self.db_path = db_path
+        self._wal_enabled = False
+        # Write-through set of verified, non-banned user ids, loaded once at startup
+        self._verified_ids = set()
+        self._verified_lock = threading.Lock()
+        # Reads share a pool of connections; all writes go through one connection owned by a
+        # dedicated writer thread, so writers never contend for SQLite's file lock.
+        self._read_pool = queue.Queue(maxsize=max(pool_size - 1, 1))
+        for _ in range(self._read_pool.maxsize):
+            self._read_pool.put(self._connect(read_only=True))
+        self._write_queue = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, args=(self._connect(),),
+                                        name="db-writer", daemon=True)
+        self._writer.start()
         self.init_database()
+        self._load_verified_ids()
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Opens a new connection suitable for sharing between threads through the pool."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        # WAL lets readers proceed while a write is in flight. It is persisted in the database
+        # file, so setting it from the first connection is enough; the rest are per-connection.
+        if not self._wal_enabled:
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._wal_enabled = True
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-20000")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA foreign_keys=ON")
+        if read_only:
+            # Reader connections can never take the write lock, so writes stay on the writer thread
+            conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    def _writer_loop(self, conn: sqlite3.Connection):
+        """Executes queued write jobs one at a time, committing each or rolling it back on error."""
+        while True:
+            job = self._write_queue.get()
+            if job is None:
+                conn.close()
+                return
+            func, future = job
+            try:
+                # Take the write lock up front so multi-statement jobs (e.g. SELECT then DELETE)
+                # see a stable snapshot and never need a lock upgrade mid-transaction
+                conn.execute("BEGIN IMMEDIATE")
+                result = func(conn)
+                conn.commit()
+            except BaseException as e:
+                try:
+                    conn.rollback()
+                except sqlite3.Error:
+                    conn.close()
+                    conn = self._connect()
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def _run_write(self, func):
+        """Runs func(conn) as a single transaction on the writer thread and returns its result."""
+        future = Future()
+        self._write_queue.put((func, future))
+        return future.result()
+
+    def close(self):
+        """Stops the writer thread and closes every pooled connection."""
+        self._write_queue.put(None)
+        self._writer.join()
+        while not self._read_pool.empty():
+            self._read_pool.get_nowait().close()
 
     @contextmanager
     def get_conn(self):
-        """Provides a database connection using a context manager to ensure it's always closed."""
-        conn = sqlite3.connect(self.db_path)
+        """Borrows a pooled read connection, returning it (or a fresh replacement if it broke) when done."""
+        conn = self._read_pool.get()
         try:
             yield conn
+        except BaseException:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                # The connection is unusable; swap in a fresh one so the pool doesn't shrink.
+                conn.close()
+                conn = self._connect(read_only=True)
+            raise
         finally:
-            conn.close()
+            self._read_pool.put(conn)
 
     def init_database(self):
         """Initializes the database schema if tables don't exist."""
-        with self.get_conn() as conn:
+        def create_schema(conn):
             cursor = conn.cursor()
             cursor.execute(''' 
                 CREATE TABLE IF NOT EXISTS verified_users (
@@ -74,100 +194,151 @@ class DatabaseManager:
                     description TEXT, link TEXT UNIQUE NOT NULL, chat_id INTEGER UNIQUE
                 )
             ''')
-            conn.commit()
-
-    def add_verified_user(self, user_id: int, username: str, first_name: str, phone_number: str):
+            # Covers the pending-request lookup in approve_pending_requests
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_jr_user_status ON join_requests(user_id, status)')
+            # Cover the status/ban counts in stats_command
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_jr_status ON join_requests(status)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_vu_banned ON verified_users(is_banned)')
+            # Approved requests are no longer kept; purge any left over from older versions
+            cursor.execute("DELETE FROM join_requests WHERE status = 'approved'")
+            # Refresh planner statistics so the indexes above get picked
+            cursor.execute('ANALYZE')
+        self._run_write(create_schema)
+
+    def _load_verified_ids(self):
         with self.get_conn() as conn:
             cursor = conn.cursor()
-            cursor.execute(''' 
-                INSERT OR REPLACE INTO verified_users (user_id, username, first_name, 
-                phone_number, verified_date, is_banned) 
-                VALUES (?, ?, ?, ?, ?, FALSE) 
-            ''', (user_id, username or "", first_name or "", phone_number, datetime.now()))
-            conn.commit()
+            cursor.execute('SELECT user_id FROM verified_users WHERE is_banned = FALSE')
+            verified_ids = {user_id for (user_id,) in cursor.fetchall()}
+        with self._verified_lock:
+            self._verified_ids = verified_ids
+
+    def add_verified_user(self, user_id: int, username: str, first_name: str, phone_number: str):
+        # Hold the lock across the write so verifies/bans reach the set in the order they committed
+        with self._verified_lock:
+            self._run_write(lambda conn: conn.execute(
+                SQL_ADD_VERIFIED_USER, (user_id, username or "", first_name or "", phone_number)
+            ))
+            self._verified_ids.add(user_id)
 
     def is_verified(self, user_id: int) -> bool:
-        with self.get_conn() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT 1 FROM verified_users WHERE user_id = ? AND is_banned = FALSE', (user_id,))
-            return cursor.fetchone() is not None
+        # Served entirely from memory; the set is updated after every committed verify/ban
+        return user_id in self._verified_ids
 
     def ban_user(self, user_id: int):
-        with self.get_conn() as conn:
-            conn.cursor().execute('UPDATE verified_users SET is_banned = TRUE WHERE user_id = ?', (user_id,))
-            conn.commit()
+        with self._verified_lock:
+            self._run_write(lambda conn: conn.execute(SQL_BAN_USER, (user_id,)))
+            self._verified_ids.discard(user_id)
 
-    def get_all_groups(self) -> List[Dict[str, Any]]:
+    def get_all_groups(self) -> List[Group]:
         with self.get_conn() as conn:
-            conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
-            cursor.execute('SELECT id, name, description, link, chat_id FROM managed_groups ORDER BY id')
-            return [dict(row) for row in cursor.fetchall()]
+            cursor.execute(SQL_ALL_GROUPS)
+            return [Group(*row) for row in cursor.fetchall()]
 
-    def add_group(self, name: str, description: str, link: str) -> bool:
+    def add_group(self, name: str, description: str, link: str) -> Optional[int]:
+        """Inserts a group and returns its new id, or None if it was rejected."""
         if not name.strip() or not link.strip():
             logger.error("Group name and link cannot be empty.")
-            return False
+            return None
         if not link.startswith(('https://t.me/', 'http://t.me/')):
             logger.error(f"Invalid Telegram link format: {link}")
-            return False
+            return None
         try:
-            with self.get_conn() as conn:
-                conn.cursor().execute('INSERT INTO managed_groups (name, description, link) VALUES (?, ?, ?)', 
-                                        (name, description, link))
-                conn.commit()
-            return True
+            return self._run_write(lambda conn: conn.execute(SQL_ADD_GROUP, (name, description, link)).lastrowid)
         except sqlite3.IntegrityError:
             logger.warning(f"Attempted to add a group with a duplicate link: {link}")
-            return False
+            return None
 
-    def remove_group(self, group_id: int) -> Optional[Dict[str, Any]]:
-        with self.get_conn() as conn:
-            conn.row_factory = sqlite3.Row
+    def remove_group(self, group_id: int) -> Optional[Group]:
+        def remove(conn):
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM managed_groups WHERE id = ?', (group_id,))
+            cursor.execute(SQL_GET_GROUP, (group_id,))
             group = cursor.fetchone()
             if group:
-                cursor.execute('DELETE FROM managed_groups WHERE id = ?', (group_id,))
-                conn.commit()
-                return dict(group)
+                cursor.execute(SQL_DELETE_GROUP, (group_id,))
+                return Group(*group)
             return None
+        return self._run_write(remove)
 
     def update_chat_id_by_link(self, link: str, chat_id: int):
-        with self.get_conn() as conn:
-            conn.cursor().execute('UPDATE managed_groups SET chat_id = ? WHERE link = ?', (chat_id, link))
-            conn.commit()
+        self._run_write(lambda conn: conn.execute(SQL_UPDATE_GROUP_CHAT_ID, (chat_id, link)))
         logger.info(f"Updated chat_id for group with link {link} to {chat_id}")
 
     def add_join_request(self, user_id: int, chat_id: int):
+        self._run_write(lambda conn: conn.execute(SQL_ADD_JOIN_REQUEST, (user_id, chat_id)))
+
+    def get_pending_join_requests(self, user_id: int) -> List[int]:
         with self.get_conn() as conn:
-            conn.cursor().execute("INSERT OR REPLACE INTO join_requests (user_id, chat_id, request_date, status) VALUES (?, ?, ?, 'pending')", 
-                                   (user_id, chat_id, datetime.now()))
-            conn.commit()
+            cursor = conn.cursor()
+            cursor.execute(SQL_PENDING_JOIN_REQUESTS, (user_id,))
+            return [chat_id for (chat_id,) in cursor.fetchall()]
 
     def update_join_request_status(self, user_id: int, chat_id: int, status: str):
+        self.bulk_update_join_status([(status, user_id, chat_id)])
+
+    def bulk_update_join_status(self, rows: List[tuple]):
+        """Applies many (status, user_id, chat_id) updates in a single transaction."""
+        if not rows:
+            return
+        # Approved requests are never read again; delete them so join_requests and its index stay small
+        updates = [row for row in rows if row[0] != "approved"]
+        resolved = [(user_id, chat_id) for status, user_id, chat_id in rows if status == "approved"]
+        def apply(conn):
+            conn.executemany(SQL_UPDATE_JOIN_REQUEST_STATUS, updates)
+            conn.executemany(SQL_DELETE_JOIN_REQUEST, resolved)
+        self._run_write(apply)
+
+    def get_stats(self) -> tuple:
+        """Returns (verified, banned, groups, pending join requests) counts."""
         with self.get_conn() as conn:
-            conn.cursor().execute("UPDATE join_requests SET status = ? WHERE user_id = ? AND chat_id = ?", 
-                                   (status, user_id, chat_id))
-            conn.commit()
+            cursor = conn.cursor()
+            cursor.execute(SQL_STATS)
+            return cursor.fetchone()
 
-    def get_user_info(self, user_id: int) -> Optional[Dict[str, Any]]:
+    def get_user_info(self, user_id: int) -> Optional[VerifiedUser]:
         with self.get_conn() as conn:
-            conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM verified_users WHERE user_id = ?', (user_id,))
+            cursor.execute(SQL_GET_USER_INFO, (user_id,))
             result = cursor.fetchone()
-            return dict(result) if result else None
+            return VerifiedUser(*result) if result else None
 
 
 class PhoneVerifier:
+    # Calling codes accepted for verification, resolved from the region metadata once at import
+    # (this also loads the PH metadata up front, so the first shared contact doesn't pay for it)
+    ALLOWED_COUNTRY_CODES = frozenset({phonenumbers.country_code_for_region('PH')})
+    ALLOWED_PREFIXES = tuple(str(code) for code in ALLOWED_COUNTRY_CODES)
+    # 63 9XX XXX XXXX, the PH mobile layout; groups split the number the way format_number does
+    PH_MOBILE_RE = re.compile(r'63(9\d{2})(\d{3})(\d{4})')
+
     @staticmethod
     def verify_phone_number(phone_number: str) -> dict:
+        # Key the cache on '+' plus digits so formatting variants of one number share an entry
+        digits = re.sub(r'\D', '', phone_number)
+        normalized = '+' + digits if phone_number.lstrip().startswith('+') else digits
+        return dict(PhoneVerifier._verify_normalized(normalized))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _verify_normalized(phone_number: str) -> dict:
+        # Numbers in international form carry their calling code up front; reject foreign ones without parsing
+        if phone_number.startswith('+') and not phone_number[1:].startswith(PhoneVerifier.ALLOWED_PREFIXES):
+            return {'is_filipino': False, 'formatted_number': phone_number}
+        # Shared contacts are SMS-verified by Telegram, so a well-formed mobile number needs no metadata lookup
+        digits = phone_number.lstrip('+')
+        if digits.startswith('0') and not phone_number.startswith('+'):
+            digits = '63' + digits[1:]
+        mobile = PhoneVerifier.PH_MOBILE_RE.fullmatch(digits)
+        if mobile:
+            return {'is_filipino': True, 'formatted_number': '+63 ' + ' '.join(mobile.groups())}
         try:
             parsed = phonenumbers.parse(phone_number, 'PH')
-            is_valid = phonenumbers.is_valid_number(parsed)
-            is_ph = phonenumbers.region_code_for_number(parsed) == 'PH'
-            return {'is_filipino': is_valid and is_ph, 
+            # O(1) reject of foreign numbers first; then one metadata check instead of
+            # is_valid_number + region_code_for_number (which each resolve the region)
+            is_filipino = (parsed.country_code in PhoneVerifier.ALLOWED_COUNTRY_CODES
+                           and phonenumbers.is_valid_number_for_region(parsed, 'PH'))
+            return {'is_filipino': is_filipino, 
                     'formatted_number': phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.INTERNATIONAL)}
         except NumberParseException:
             return {'is_filipino': False, 'formatted_number': phone_number}
@@ -182,7 +353,15 @@ class FilipinoBotManager:
         self.db = DatabaseManager()
         self.verifier = PhoneVerifier()
         self._groups_lock = threading.Lock()
-        self.filipino_groups = []
+        # Immutable snapshot, replaced wholesale on every change (copy-on-write).
+        # _groups_lock only serializes writers; readers just take the current reference.
+        self.filipino_groups = ()
+        self._formatted_groups_md = ""
+        self._verified_welcome_md = ""
+        self._groups_by_chat_id = {}
+        self._groups_by_link = {}
+        # chat_id -> title for chats outside managed_groups, filled from get_chat
+        self._chat_titles = {}
         self.refresh_groups_cache()
 
         # New: Dictionary to track the start time of verification process
@@ -195,7 +374,7 @@ class FilipinoBotManager:
             if user_id not in self.verification_start_time:
                 return  # If the user has already been verified, don't notify
             # Send a reminder to the user if they haven't verified yet
-            user = self.db.get_user_info(user_id)
+            user = await asyncio.to_thread(self.db.get_user_info, user_id)
             if user:
                 # Send reminder message
                 try:
@@ -213,28 +392,64 @@ class FilipinoBotManager:
                     logger.error(f"Error sending verification reminder to {user_id}: {e}")
         asyncio.create_task(check_verification_timeout())
 
+    def _publish_groups(self, groups: tuple):
+        """Swaps in a new groups snapshot with its lookups and pre-rendered messages. Caller must hold _groups_lock."""
+        self._groups_by_chat_id = {g.chat_id: g for g in groups if g.chat_id is not None}
+        self._groups_by_link = {g.link: g for g in groups}
+        self._formatted_groups_md = self._render_groups(groups)
+        self._verified_welcome_md = "✅ *Na-verify ka na!*\n\n" + self._formatted_groups_md
+        self.filipino_groups = groups
+
+    @staticmethod
+    def _render_groups(groups: tuple) -> str:
+        if not groups:
+            return "🔍 No groups available at the moment."
+        parts = ["🇵🇭 **Available Filipino Groups:**\n\n"]
+        for group in groups:
+            parts.append(f"**- {group.name}**\n 📝 {group.description}\n 🔗 {group.link}\n\n")
+        parts.append("💡 **Tip:** Verified users are auto-approved!")
+        return "".join(parts)
+
     def refresh_groups_cache(self):
         with self._groups_lock:
-            self.filipino_groups = self.db.get_all_groups()
+            self._publish_groups(tuple(self.db.get_all_groups()))
         logger.info("Refreshed groups cache from database.")
 
-    def format_available_groups(self) -> str:
+    def add_group(self, name: str, description: str, link: str) -> bool:
+        """Adds a group to the database and the in-memory cache in one step."""
+        with self._groups_lock:
+            group_id = self.db.add_group(name, description, link)
+            if group_id is None:
+                return False
+            new_group = Group(group_id, name, description, link, None)
+            self._publish_groups(self.filipino_groups + (new_group,))
+        return True
+
+    def remove_group(self, group_id: int) -> Optional[Group]:
+        """Removes a group from the database and the in-memory cache in one step."""
         with self._groups_lock:
-            if not self.filipino_groups:
-                return "🔍 No groups available at the moment."
-            message = "🇵🇭 **Available Filipino Groups:**\n\n"
-            for group in self.filipino_groups:
-                message += f"**- {group['name']}**\n"
-                message += f" 📝 {group['description']}\n"
-                message += f" 🔗 {group['link']}\n\n"
-            message += "💡 **Tip:** Verified users are auto-approved!"
-            return message
+            removed_group = self.db.remove_group(group_id)
+            if removed_group:
+                self._publish_groups(tuple(g for g in self.filipino_groups if g.id != group_id))
+        return removed_group
+
+    def set_group_chat_id(self, link: str, chat_id: int):
+        """Stores the chat_id for the group with the given link in the database and the cache."""
+        with self._groups_lock:
+            self.db.update_chat_id_by_link(link, chat_id)
+            self._publish_groups(tuple(
+                g._replace(chat_id=chat_id) if g.link == link else g for g in self.filipino_groups
+            ))
+
+    def format_available_groups(self) -> str:
+        # Rendered once per change in _publish_groups; a plain attribute read needs no lock
+        return self._formatted_groups_md
 
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         user = update.effective_user
         if self.db.is_verified(user.id):
             await update.message.reply_text(
-                "✅ *Na-verify ka na!*\n\n" + self.format_available_groups(), parse_mode=ParseMode.MARKDOWN, 
+                self._verified_welcome_md, parse_mode=ParseMode.MARKDOWN, 
                 disable_web_page_preview=True
             )
         else:
@@ -257,8 +472,8 @@ class FilipinoBotManager:
             return
         phone_result = self.verifier.verify_phone_number(contact.phone_number)
         if phone_result['is_filipino']:
-            self.db.add_verified_user(user.id, user.username, user.first_name, contact.phone_number)
-            success_msg = f"✅ **VERIFIED!** 🇵🇭\n\nWelcome, {user.first_name}!\n\nYour number {phone_result['formatted_number']} is verified. You now have access to all our groups and will be auto-approved.\n\n{self.format_available_groups()}"
+            await asyncio.to_thread(self.db.add_verified_user, user.id, user.username, user.first_name, contact.phone_number)
+            success_msg = f"✅ **VERIFIED!** 🇵🇭\n\nWelcome, {user.first_name}!\n\nYour number {phone_result['formatted_number']} is verified. You now have access to all our groups and will be auto-approved.\n\n{self._formatted_groups_md}"
             await update.message.reply_text(success_msg, parse_mode=ParseMode.MARKDOWN, 
                                            disable_web_page_preview=True, reply_markup=ReplyKeyboardRemove())
             await context.bot.send_message(
@@ -275,42 +490,61 @@ class FilipinoBotManager:
             fail_msg = f"❌ **Verification Failed**\n\nThe number you provided ({phone_result['formatted_number']}) is not recognized as a Philippine number. Please try again with a valid PH number."
             await update.message.reply_text(fail_msg, reply_markup=ReplyKeyboardRemove())
 
+    async def _get_chat_title(self, context: ContextTypes.DEFAULT_TYPE, chat_id: int) -> str:
+        """Resolves a chat title from the groups cache, then earlier get_chat results, then the Bot API."""
+        group = self._groups_by_chat_id.get(chat_id)
+        if group:
+            return group.name
+        title = self._chat_titles.get(chat_id)
+        if title is None:
+            try:
+                chat = await context.bot.get_chat(chat_id)
+            except Exception as e:
+                logger.warning(f"Could not get chat info for {chat_id}: {e}")
+                return str(chat_id)
+            title = self._chat_titles[chat_id] = chat.title
+        return title
+
     async def approve_pending_requests(self, context: ContextTypes.DEFAULT_TYPE, user_id: int):
         """Auto-approve any pending join requests for a newly verified user."""
         try:
-            with self.db.get_conn() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT chat_id FROM join_requests WHERE user_id = ? AND status = 'pending'", (user_id,)
+            # Fetch up front so no pooled connection is held across the Telegram API awaits below
+            pending_chat_ids = await asyncio.to_thread(self.db.get_pending_join_requests, user_id)
+
+            async def approve_one(chat_id: int) -> tuple:
+                try:
+                    # Try to approve the pending request
+                    await context.bot.approve_chat_join_request(chat_id=chat_id, user_id=user_id)
+                except Exception as e:
+                    logger.warning(f"Could not approve pending request for user {user_id} to chat {chat_id}: {e}")
+                    return ("error", user_id, chat_id)
+
+                chat_title = await self._get_chat_title(context, chat_id)
+                # Welcome message and admin notice are independent; send them concurrently
+                welcome_result, admin_result = await asyncio.gather(
+                    context.bot.send_message(
+                        chat_id=user_id,
+                        text=f"🎉 **Automatically Approved!**\n\nYou've been approved to join **{chat_title}** since you're now a verified Filipino user! 🇵🇭",
+                        parse_mode=ParseMode.MARKDOWN
+                    ),
+                    context.bot.send_message(
+                        ADMIN_ID,
+                        f"🎉 Auto-approved pending request: User {user_id} for {chat_title}",
+                        parse_mode=ParseMode.MARKDOWN
+                    ),
+                    return_exceptions=True
                 )
-                pending_requests = cursor.fetchall()
+                if isinstance(welcome_result, Exception):
+                    logger.warning(f"Could not send welcome message to {user_id}: {welcome_result}")
+                if isinstance(admin_result, Exception):
+                    logger.warning(f"Could not notify admin about approval of {user_id} to {chat_id}: {admin_result}")
+                return ("approved", user_id, chat_id)
 
-                for (chat_id,) in pending_requests:
-                    try:
-                        # Try to approve the pending request
-                        await context.bot.approve_chat_join_request(chat_id=chat_id, user_id=user_id)
-                        self.db.update_join_request_status(user_id, chat_id, "approved")
-
-                        # Get chat info for welcome message
-                        try:
-                            chat = await context.bot.get_chat(chat_id)
-                            await context.bot.send_message(
-                                chat_id=user_id,
-                                text=f"🎉 **Automatically Approved!**\n\nYou've been approved to join **{chat.title}** since you're now a verified Filipino user! 🇵🇭",
-                                parse_mode=ParseMode.MARKDOWN
-                            )
-                        except Exception as e:
-                            logger.warning(f"Could not send welcome message to {user.id}: {e}")
-
-                        # Notify admin
-                        await context.bot.send_message(
-                            ADMIN_ID,
-                            f"🎉 Auto-approved pending request: User {user_id} for {chat.title}",
-                            parse_mode=ParseMode.MARKDOWN
-                        )
-                    except Exception as e:
-                        logger.warning(f"Could not approve pending request for user {user_id} to chat {chat_id}: {e}")
-                        self.db.update_join_request_status(user_id, chat_id, "error")
+            # Chats are independent, so approve them concurrently rather than one round-trip chain at a time
+            status_updates = await asyncio.gather(*(approve_one(chat_id) for chat_id in pending_chat_ids))
+
+            # Record every outcome in one transaction instead of a commit per chat
+            await asyncio.to_thread(self.db.bulk_update_join_status, status_updates)
         except Exception as e:
             logger.error(f"Error checking pending requests for user {user_id}: {e}")
 
@@ -336,7 +570,7 @@ class FilipinoBotManager:
             return
         try:
             user_id = int(context.args[0])
-            self.db.ban_user(user_id)
+            await asyncio.to_thread(self.db.ban_user, user_id)
             await update.message.reply_text(f"🚫 User {user_id} is now banned.", parse_mode=ParseMode.MARKDOWN)
         except (ValueError, IndexError):
             await update.message.reply_text("❌ Invalid user ID. Please provide a valid numeric user ID.")
@@ -345,16 +579,7 @@ class FilipinoBotManager:
         if update.effective_user.id != ADMIN_ID:
             await update.message.reply_text("❌ You don't have permission to use this command.")
             return
-        with self.db.get_conn() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT COUNT(*) FROM verified_users WHERE is_banned = FALSE')
-            verified_count = cursor.fetchone()[0]
-            cursor.execute('SELECT COUNT(*) FROM verified_users WHERE is_banned = TRUE')
-            banned_count = cursor.fetchone()[0]
-            cursor.execute('SELECT COUNT(*) FROM managed_groups')
-            groups_count = cursor.fetchone()[0]
-            cursor.execute('SELECT COUNT(*) FROM join_requests WHERE status = "pending"')
-            pending_requests = cursor.fetchone()[0]
+        verified_count, banned_count, groups_count, pending_requests = await asyncio.to_thread(self.db.get_stats)
         stats_text = f"""📊 **Bot Statistics** 👥 **Users:** • Verified: {verified_count} • Banned: {banned_count} 🏢 **Groups:** {groups_count} ⏳ **Pending Join Requests:** {pending_requests}"""
         await update.message.reply_text(stats_text, parse_mode=ParseMode.MARKDOWN)
 
@@ -374,8 +599,7 @@ class FilipinoBotManager:
             name = context.args[1].strip('"')
             description = context.args[2].strip('"')
             link = context.args[3].strip('"')
-            if self.db.add_group(name, description, link):
-                self.refresh_groups_cache()
+            if await asyncio.to_thread(self.add_group, name, description, link):
                 await update.message.reply_text(f"✅ Group **{name}** added successfully!", parse_mode=ParseMode.MARKDOWN)
             else:
                 await update.message.reply_text("❌ Failed to add group. Check if the link is valid and not already in use.")
@@ -385,29 +609,26 @@ class FilipinoBotManager:
                 return
             try:
                 group_id = int(context.args[1])
-                removed_group = self.db.remove_group(group_id)
+                removed_group = await asyncio.to_thread(self.remove_group, group_id)
                 if removed_group:
-                    self.refresh_groups_cache()
-                    await update.message.reply_text(f"✅ Group **{removed_group['name']}** removed successfully!", parse_mode=ParseMode.MARKDOWN)
+                    await update.message.reply_text(f"✅ Group **{removed_group.name}** removed successfully!", parse_mode=ParseMode.MARKDOWN)
                 else:
                     await update.message.reply_text("❌ Group not found.")
             except ValueError:
                 await update.message.reply_text("❌ Please provide a valid group ID.")
         elif action == "list":
-            groups = self.db.get_all_groups()
+            groups = self.filipino_groups
             if not groups:
                 await update.message.reply_text("📝 No groups found.")
                 return
-            message = "📋 **Managed Groups:**\n\n"
+            parts = ["📋 **Managed Groups:**\n\n"]
             for group in groups:
-                message += f"**ID:** {group['id']}\n"
-                message += f"**Name:** {group['name']}\n"
-                message += f"**Description:** {group['description']}\n"
-                message += f"**Link:** {group['link']}\n"
-                message += f"**Chat ID:** {group['chat_id'] or 'Not set'}\n\n"
+                parts.append(f"**ID:** {group.id}\n**Name:** {group.name}\n**Description:** {group.description}\n"
+                             f"**Link:** {group.link}\n**Chat ID:** {group.chat_id or 'Not set'}\n\n")
+            message = "".join(parts)
             await update.message.reply_text(message, parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=True)
         elif action == "refresh":
-            self.refresh_groups_cache()
+            await asyncio.to_thread(self.refresh_groups_cache)
             await update.message.reply_text("✅ Groups cache refreshed successfully!")
         else:
             await update.message.reply_text("❌ Unknown action. Use: add, remove, list, or refresh")
@@ -419,32 +640,38 @@ class FilipinoBotManager:
         chat = join_request.chat
         logger.info(f"Join request from {user.first_name} (@{user.username}) to {chat.title}")
         # Log the join request
-        self.db.add_join_request(user.id, chat.id)
+        await asyncio.to_thread(self.db.add_join_request, user.id, chat.id)
         # Check if user is verified
         if self.db.is_verified(user.id):
             try:
                 # Auto-approve verified users
                 await context.bot.approve_chat_join_request(chat_id=chat.id, user_id=user.id)
-                self.db.update_join_request_status(user.id, chat.id, "approved")
-                # Welcome message
-                try:
-                    await context.bot.send_message(
+            except Exception as e:
+                logger.error(f"Failed to approve join request: {e}")
+                await asyncio.to_thread(self.db.update_join_request_status, user.id, chat.id, "error")
+            else:
+                # Recording the approval, the welcome message and the admin notice are independent
+                db_result, welcome_result, admin_result = await asyncio.gather(
+                    asyncio.to_thread(self.db.update_join_request_status, user.id, chat.id, "approved"),
+                    context.bot.send_message(
                         chat_id=user.id,
                         text=f"✅ Welcome to **{chat.title}**! You've been automatically approved as a verified Filipino user. 🇵🇭",
                         parse_mode=ParseMode.MARKDOWN
-                    )
-                except Exception as e:
-                    logger.warning(f"Could not send welcome message to {user.id}: {e}")
-                # Notify admin
-                await context.bot.send_message(
-                    ADMIN_ID, 
-                    f"✅ Auto-approved verified user: {user.first_name} (@{user.username or 'N/A'}) to {chat.title}",
-                    parse_mode=ParseMode.MARKDOWN
+                    ),
+                    context.bot.send_message(
+                        ADMIN_ID, 
+                        f"✅ Auto-approved verified user: {user.first_name} (@{user.username or 'N/A'}) to {chat.title}",
+                        parse_mode=ParseMode.MARKDOWN
+                    ),
+                    return_exceptions=True
                 )
+                if isinstance(db_result, Exception):
+                    logger.error(f"Could not record approval of {user.id} to {chat.title}: {db_result}")
+                if isinstance(welcome_result, Exception):
+                    logger.warning(f"Could not send welcome message to {user.id}: {welcome_result}")
+                if isinstance(admin_result, Exception):
+                    logger.warning(f"Could not notify admin about approval of {user.id}: {admin_result}")
                 logger.info(f"Auto-approved verified user {user.id} to {chat.title}")
-            except Exception as e:
-                logger.error(f"Failed to approve join request: {e}")
-                self.db.update_join_request_status(user.id, chat.id, "error")
         else:
             # DON'T decline - keep request pending and guide user to verify
             try:
@@ -485,7 +712,7 @@ class FilipinoBotManager:
             logger.info(f"User {user.first_name} ({user.id}) status changed from {old_status} to {new_status} in {chat.title}")
         # If user was banned, update their status
         if new_status == ChatMemberStatus.BANNED:
-            self.db.ban_user(user.id)
+            await asyncio.to_thread(self.db.ban_user, user.id)
             await context.bot.send_message(
                 ADMIN_ID, 
                 f"🚫 User {user.first_name} (@{user.username or 'N/A'}) was banned from {chat.title}",
@@ -501,36 +728,38 @@ class FilipinoBotManager:
         logger.info(f"Bot status changed from {old_status} to {new_status} in {chat.title}")
         # If bot was added to a group, try to update the chat_id in database
         if new_status in [ChatMemberStatus.MEMBER, ChatMemberStatus.ADMINISTRATOR]:
-            invite_link = None
-            try:
-                # Try to get the primary invite link
-                invite_link = await context.bot.export_chat_invite_link(chat.id)
-                logger.info(f"Got invite link for {chat.title}: {invite_link}")
-            except Exception as e:
-                logger.warning(f"Could not get invite link for {chat.title}: {e}")
-            # Try to match with stored groups
-            groups = self.db.get_all_groups()
-            updated = False
-            for group in groups:
-                match_found = False
-                # 1. Try to match by invite link
-                if invite_link and group['link'] == invite_link:
-                    match_found = True
-                # 2. Try to match by username
-                elif 't.me/' in group['link'] and not group['link'].startswith('t.me/+'):
-                    stored_username = group['link'].split('t.me/')[-1].split('?')[0]
-                    if chat.username and chat.username.lower() == stored_username.lower():
-                        match_found = True
+            # Try to match with stored groups, cheapest first.
+            # The groups cache already mirrors managed_groups; no need to re-read it
+            groups = self.filipino_groups
+            match = None
+            # Private chats (e.g. a user unblocking the bot) have no username, invite link or title to match
+            if chat.type != ChatType.PRIVATE:
+                # 1. Public groups match by username with no API call
+                if chat.username:
+                    for group in groups:
+                        stored_username = group.link.split('t.me/')[-1].split('?')[0]
+                        if not stored_username.startswith(('+', 'joinchat/')) and stored_username.lower() == chat.username.lower():
+                            match = group
+                            break
+                # 2. Otherwise ask Telegram for the primary invite link and look it up
+                if match is None:
+                    try:
+                        invite_link = await context.bot.export_chat_invite_link(chat.id)
+                        logger.info(f"Got invite link for {chat.title}: {invite_link}")
+                        match = self._groups_by_link.get(invite_link)
+                    except Exception as e:
+                        logger.warning(f"Could not get invite link for {chat.title}: {e}")
                 # 3. Try to match by chat title (fallback)
-                elif not updated and group['name'].lower() == chat.title.lower():
-                    match_found = True
-                    logger.warning(f"Matched group by title (less reliable): {chat.title}")
-                if match_found:
-                    self.db.update_chat_id_by_link(group['link'], chat.id)
-                    self.refresh_groups_cache()
-                    updated = True
-                    logger.info(f"Updated chat_id for group '{group['name']}' to {chat.id}")
-                    break
+                if match is None:
+                    for group in groups:
+                        if chat.title and group.name.lower() == chat.title.lower():
+                            match = group
+                            logger.warning(f"Matched group by title (less reliable): {chat.title}")
+                            break
+            updated = match is not None
+            if updated:
+                await asyncio.to_thread(self.set_group_chat_id, match.link, chat.id)
+                logger.info(f"Updated chat_id for group '{match.name}' to {chat.id}")
             if not updated:
                 logger.warning(f"Could not match group {chat.title} (ID: {chat.id}) with any stored group")
             await context.bot.send_message(
@@ -546,7 +775,11 @@ class FilipinoBotManager:
             )
 
     def run(self):
-        persistence = PicklePersistence(filepath="filipino_bot_persistence")
+        # Handlers keep no per-user/per-chat state, so only the small bot_data section is pickled
+        persistence = PicklePersistence(
+            filepath="filipino_bot_persistence",
+            store_data=PersistenceInput(bot_data=True, chat_data=False, user_data=False, callback_data=False)
+        )
         application = Application.builder().token(BOT_TOKEN).persistence(persistence).build()
         # Command handlers
         application.add_handler(CommandHandler("start", self.start_command))
@@ -562,7 +795,10 @@ class FilipinoBotManager:
         application.add_handler(ChatMemberHandler(self.handle_chat_member_update, ChatMemberHandler.CHAT_MEMBER))
         application.add_handler(ChatMemberHandler(self.handle_my_chat_member_update, ChatMemberHandler.MY_CHAT_MEMBER))
         logger.info("🚀 Filipino Verification Bot (v3.1 - Complete) is starting...")
-        application.run_polling(allowed_updates=Update.ALL_TYPES)
+        try:
+            application.run_polling(allowed_updates=Update.ALL_TYPES)
+        finally:
+            self.db.close()
 
 
 def main():